@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Hashable, Optional
+
+# Sentinel returned by TTLCache.get so a cached None can be told apart from a miss
+MISSING = object()
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a time-to-live"""
+    
+    def __init__(self, maxsize: int, ttl: float, lock_stripes: int = 64):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced with one can be discarded
+        self.generation = 0
+        # Fixed set of striped locks so concurrent misses on the same key load it once
+        self._key_locks = [threading.Lock() for _ in range(lock_stripes)]
+    
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Get a live entry, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None):
+        """Store an entry, evicting the least recently used one when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            # A value read before the last invalidation may already be stale
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        """Drop an entry if present"""
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(key, None)
+    
+    def delete_value(self, value: Any):
+        """Drop every entry holding the given value"""
+        with self._lock:
+            self.generation += 1
+            stale_keys = [key for key, (cached, _) in self._entries.items() if cached == value]
+            for key in stale_keys:
+                del self._entries[key]
+    
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+    
+    @contextmanager
+    def key_lock(self, key: Hashable):
+        """Hold the lock guarding loads of key, to prevent a stampede of concurrent misses"""
+        lock = self._key_locks[hash(key) % len(self._key_locks)]
+        with lock:
+            yield
@@ -1,163 +1,446 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
 import logging
 
 logger = logging.getLogger(__name__)
 
 DATABASE_PATH = "tasks.db"
+READER_POOL_SIZE = 8
+# Seconds to wait for a free pooled connection before giving up
+POOL_ACQUIRE_TIMEOUT = 10
+STATEMENT_CACHE_SIZE = 256
+# Set SQLITE_TRACE=1 to log every statement SQLite executes, at DEBUG level
+SQLITE_TRACE = os.getenv("SQLITE_TRACE", "0") == "1"
 
-def get_connection():
+# Per-connection tuning: WAL lets readers run alongside the writer and
+# synchronous=NORMAL is durable enough under WAL with a single fsync per checkpoint;
+# mmap_size (256 MB) serves reads from the OS page cache without a copy per page
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA cache_size=-64000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA busy_timeout=5000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+"""
+
+# Full schema, applied as one script inside a single IMMEDIATE transaction so it
+# is parsed once, committed with one fsync and never seen half-created
+SCHEMA_SQL = """
+BEGIN IMMEDIATE;
+
+-- Tasks table
+CREATE TABLE IF NOT EXISTS tasks (
+    taskId INTEGER PRIMARY KEY AUTOINCREMENT,
+    userId BIGINT NOT NULL,
+    taskName TEXT NOT NULL,
+    category TEXT NOT NULL,
+    time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Members table
+CREATE TABLE IF NOT EXISTS members (
+    userId VARCHAR(30) PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    relationship TEXT NOT NULL,
+    nickname TEXT NOT NULL,
+    gender TEXT NOT NULL,
+    birthday TIMESTAMP,
+    password TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Sessions table. Every lookup is by token, so the token is the clustered
+-- primary key of a WITHOUT ROWID table: one B-tree, no rowid hop
+CREATE TABLE IF NOT EXISTS sessions (
+    sessionToken TEXT PRIMARY KEY,
+    sessionId VARCHAR(100) UNIQUE NOT NULL,
+    userId VARCHAR(30) NOT NULL,
+    expiresAt INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (userId) REFERENCES members(userId) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Indexes for tasks table. Single-column userId and status indexes are
+-- dropped: they are prefixes of the composites below and only cost writes
+DROP INDEX IF EXISTS idx_user_id;
+DROP INDEX IF EXISTS idx_status;
+CREATE INDEX IF NOT EXISTS idx_time ON tasks(time);
+
+-- Composite index so per-user listings come out of the B-tree already ordered
+-- by time instead of going through a temp sort. It is kept ascending: a
+-- backwards scan then yields (time DESC, taskId DESC), the keyset order used
+-- for pagination
+CREATE INDEX IF NOT EXISTS idx_tasks_user_time ON tasks(userId, time);
+
+-- Same idea for the status and category listings, which filter on one column
+-- and order by time DESC
+CREATE INDEX IF NOT EXISTS idx_tasks_status_time ON tasks(status, time);
+CREATE INDEX IF NOT EXISTS idx_tasks_category_time ON tasks(category, time);
+
+-- Indexes for members table. email is UNIQUE, so its automatic index already
+-- serves the login lookup and a second one would only cost writes
+DROP INDEX IF EXISTS idx_members_email;
+CREATE INDEX IF NOT EXISTS idx_members_relationship ON members(relationship);
+
+-- Indexes for sessions table. A user holds at most one session, so userId is
+-- unique; create_session upserts against it. The token needs no index of its
+-- own now that it is the primary key
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_user_unique ON sessions(userId);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expiresAt);
+
+-- expiresAt is unix seconds, compared as an integer; older rows stored it as
+-- local ISO text, so convert any left over
+UPDATE sessions SET expiresAt = CAST(strftime('%s', expiresAt, 'utc') AS INTEGER) WHERE typeof(expiresAt) = 'text';
+
+COMMIT;
+"""
+
+# Rebuilds a sessions table created before it became WITHOUT ROWID, keeping
+# only the newest session per user. Runs before SCHEMA_SQL so the unique
+# userId index is never built over duplicates. The statements run one by one
+# inside a transaction opened by rebuild_sessions_table
+SESSIONS_REBUILD_STATEMENTS = (
+    """
+    CREATE TABLE sessions_new (
+        sessionToken TEXT PRIMARY KEY,
+        sessionId VARCHAR(100) UNIQUE NOT NULL,
+        userId VARCHAR(30) NOT NULL,
+        expiresAt INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (userId) REFERENCES members(userId) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """,
+    """
+    INSERT INTO sessions_new (sessionToken, sessionId, userId, expiresAt, created_at)
+    SELECT sessionToken, sessionId, userId, expiresAt, created_at
+    FROM sessions
+    WHERE rowid IN (SELECT MAX(rowid) FROM sessions GROUP BY userId)
+    """,
+    "DROP TABLE sessions",
+    "ALTER TABLE sessions_new RENAME TO sessions",
+)
+
+# (expected index, query, sample params) for the startup EXPLAIN QUERY PLAN check
+QUERY_PLAN_CHECKS = [
+    ("idx_tasks_user_time", """
+        SELECT taskId, userId, taskName, category, time, status
+        FROM tasks
+        WHERE userId = ? AND (time, taskId) < (?, ?)
+        ORDER BY time DESC, taskId DESC
+        LIMIT ?
+    """, ("", "", 0, 1)),
+    ("idx_time", """
+        SELECT taskId, userId, taskName, category, time, status
+        FROM tasks
+        WHERE (time, taskId) < (?, ?)
+        ORDER BY time DESC, taskId DESC
+        LIMIT ?
+    """, ("", 0, 1)),
+    ("idx_tasks_status_time", """
+        SELECT taskId, userId, taskName, category, time, status
+        FROM tasks
+        WHERE status = ?
+        ORDER BY time DESC
+    """, ("",)),
+    ("idx_tasks_category_time", """
+        SELECT taskId, userId, taskName, category, time, status
+        FROM tasks
+        WHERE category = ?
+        ORDER BY time DESC
+    """, ("",)),
+]
+
+class SqliteConnection(sqlite3.Connection):
+    """sqlite3 connection carrying one reusable cursor for short, fully-fetched hot queries"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cursors copy the row factory when created, so set it first
+        self.row_factory = sqlite3.Row
+        self.shared_cursor = self.cursor()
+
+def get_connection(read_only: bool = False):
     """Get database connection with proper settings"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
+        # Readers run in autocommit mode and never hold a transaction open between
+        # queries; the writer opens BEGIN IMMEDIATE so it takes the write lock up
+        # front and waits on busy_timeout instead of failing a lock upgrade
+        # when another worker process is writing
+        isolation_level = None if read_only else "IMMEDIATE"
+        conn = sqlite3.connect(DATABASE_PATH, factory=SqliteConnection, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE, isolation_level=isolation_level)
+        conn.executescript(CONNECTION_PRAGMAS)
+        if read_only:
+            conn.execute("PRAGMA query_only=1")
+        if SQLITE_TRACE:
+            conn.set_trace_callback(logger.debug)
         return conn
     except sqlite3.Error as e:
         logger.error(f"Database connection error: {str(e)}")
         raise
 
-def get_db():
-    """Dependency for database connections"""
-    conn = None
+class SqliteConnectionPool:
+    """Bounded pool of long-lived, pre-configured SQLite connections"""
+    
+    def __init__(self, pool_size: int, read_only: bool = False):
+        self.pool_size = pool_size
+        self.read_only = read_only
+        self._connections = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._open = False
+    
+    def open(self):
+        """Fill the pool with connections (called once from init_db)"""
+        with self._lock:
+            if self._open:
+                return
+            for _ in range(self.pool_size):
+                self._connections.put(get_connection(self.read_only))
+            self._open = True
+            logger.info(f"Opened SQLite {'reader' if self.read_only else 'writer'} pool with {self.pool_size} connections")
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool, waiting a bounded time if all of them are in use"""
+        if not self._open:
+            raise RuntimeError("Connection pool is not open; call init_db() first")
+        try:
+            return self._connections.get(timeout=POOL_ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            logger.error(f"No pooled connection freed up within {POOL_ACQUIRE_TIMEOUT}s")
+            raise RuntimeError(f"Timed out waiting for a database connection after {POOL_ACQUIRE_TIMEOUT}s")
+    
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """Return a connection to the pool, replacing it when it is broken"""
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to roll back pooled connection: {str(e)}")
+                discard = True
+        
+        with self._lock:
+            if not self._open:
+                conn.close()
+                return
+            if discard:
+                conn.close()
+                conn = get_connection(self.read_only)
+            self._connections.put(conn)
+    
+    def close_all(self):
+        """Close every idle connection and stop handing out new ones"""
+        with self._lock:
+            self._open = False
+            while True:
+                try:
+                    conn = self._connections.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+        logger.info(f"Closed SQLite {'reader' if self.read_only else 'writer'} pool")
+
+class WriterThread:
+    """Dedicated thread that owns the only read-write connection and applies writes in order"""
+    
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._conn = None
+    
+    def open(self):
+        """Open the read-write connection and start the writer thread (called once from init_db)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._conn = get_connection()
+            self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+            self._thread.start()
+            logger.info("Started SQLite writer thread")
+    
+    def _run(self):
+        """Consume (func, args, kwargs, future) work items until close() posts the stop marker"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            func, args, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(self._conn, *args, **kwargs)
+            except BaseException as e:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        self._conn.close()
+    
+    def submit(self, func, *args, **kwargs) -> Future:
+        """Queue func(conn, *args, **kwargs) to run on the writer thread"""
+        if self._thread is None:
+            raise RuntimeError("Writer thread is not running; call init_db() first")
+        future = Future()
+        self._jobs.put((func, args, kwargs, future))
+        return future
+    
+    def execute(self, func, *args, **kwargs):
+        """Run func(conn, *args, **kwargs) on the writer thread and wait for its result"""
+        # Nested writes issued from the writer thread itself run inline
+        if threading.current_thread() is self._thread:
+            return func(self._conn, *args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+    
+    def close(self):
+        """Finish queued writes, then stop the thread and close its connection"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+            self._conn = None
+        logger.info("Stopped SQLite writer thread")
+
+# WAL allows any number of readers next to a single writer: reads borrow
+# query-only connections from the pool while every write in this process is
+# funnelled through one thread; busy_timeout covers writers in other processes
+reader_pool = SqliteConnectionPool(READER_POOL_SIZE, read_only=True)
+writer = WriterThread()
+
+_init_lock = threading.Lock()
+
+# get_database_info is diagnostic only, so a slightly stale COUNT(*) is fine
+DATABASE_INFO_TTL = 10
+_database_info = None
+_database_info_refreshed_at = 0.0
+_database_info_lock = threading.Lock()
+
+@contextmanager
+def pooled_connection(conn_pool: SqliteConnectionPool):
+    """Context manager that borrows a connection from a pool"""
+    conn = conn_pool.acquire()
+    discard = False
     try:
-        conn = get_connection()
         yield conn
+    except sqlite3.OperationalError as e:
+        # The connection itself may be unusable; swap in a fresh one
+        discard = True
+        logger.error(f"Database operational error: {str(e)}")
+        raise
     except sqlite3.Error as e:
-        if conn:
-            conn.rollback()
         logger.error(f"Database transaction error: {str(e)}")
         raise
     finally:
-        if conn:
-            conn.close()
+        # release() rolls back anything the caller left uncommitted
+        conn_pool.release(conn, discard)
 
-@contextmanager
-def get_db_context():
-    """Context manager for database connections"""
-    conn = None
-    try:
-        conn = get_connection()
+def get_db_reader():
+    """Dependency for read-only database connections"""
+    with pooled_connection(reader_pool) as conn:
         yield conn
-    except sqlite3.Error as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"Database transaction error: {str(e)}")
+
+def sessions_needs_rebuild(conn: sqlite3.Connection) -> bool:
+    """Check whether an existing sessions table still uses a rowid"""
+    sessions_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'sessions'").fetchone()
+    return sessions_sql is not None and "WITHOUT ROWID" not in sessions_sql[0].upper()
+
+def rebuild_sessions_table(conn: sqlite3.Connection):
+    """Rebuild the sessions table as WITHOUT ROWID in one IMMEDIATE transaction"""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-check under the write lock: another worker may have rebuilt it while we waited
+        if sessions_needs_rebuild(conn):
+            for statement in SESSIONS_REBUILD_STATEMENTS:
+                conn.execute(statement)
+            logger.info("Rebuilt sessions table as WITHOUT ROWID")
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
         raise
-    finally:
-        if conn:
-            conn.close()
+
+def create_schema(conn: sqlite3.Connection):
+    """Create tables and indexes, then sanity-check journal mode and query plans"""
+    # Cheap unlocked check first so an up-to-date database never takes the write lock for it
+    if sessions_needs_rebuild(conn):
+        rebuild_sessions_table(conn)
+    
+    conn.executescript(SCHEMA_SQL)
+    logger.info("Database tables created successfully")
+    
+    # journal_mode=WAL is persisted in the database file, so confirm it stuck
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode.lower() != "wal":
+        logger.warning(f"Expected WAL journal mode but database is using: {journal_mode}")
+    
+    # Confirm the planner serves each hot listing from its index without a temp sort
+    for index_name, query, params in QUERY_PLAN_CHECKS:
+        cursor = conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        query_plan = " | ".join(row[3] for row in cursor.fetchall())
+        if index_name not in query_plan or "TEMP B-TREE" in query_plan:
+            logger.warning(f"Query is not using {index_name}: {query_plan}")
+        else:
+            logger.info(f"Query plan: {query_plan}")
 
 def init_db():
     """Initialize database with required tables"""
-    try:
-        with get_db_context() as conn:
-            cursor = conn.cursor()
-            
-            # Create tasks table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    taskId INTEGER PRIMARY KEY AUTOINCREMENT,
-                    userId BIGINT NOT NULL,
-                    taskName TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    time TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create members table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS members (
-                    userId VARCHAR(30) PRIMARY KEY,
-                    email TEXT UNIQUE NOT NULL,
-                    relationship TEXT NOT NULL,
-                    nickname TEXT NOT NULL,
-                    gender TEXT NOT NULL,
-                    birthday TIMESTAMP,
-                    password TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create sessions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sessions (
-                    sessionId VARCHAR(100) PRIMARY KEY,
-                    userId VARCHAR(30) NOT NULL,
-                    sessionToken TEXT UNIQUE NOT NULL,
-                    expiresAt TIMESTAMP NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (userId) REFERENCES members(userId) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Create index for better performance
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_user_id ON tasks(userId)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_time ON tasks(time)
-            ''')
+    # Serialize initialization so two workers never race on CREATE TABLE
+    with _init_lock:
+        try:
+            # Schema changes go through the writer so they never contend with request writes
+            writer.open()
+            writer.execute(create_schema)
+            reader_pool.open()
             
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_status ON tasks(status)
-            ''')
-            
-            # Create indexes for members table
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_members_email ON members(email)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_members_relationship ON members(relationship)
-            ''')
-            
-            # Create indexes for sessions table
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_sessions_userId ON sessions(userId)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_sessions_token ON sessions(sessionToken)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expiresAt)
-            ''')
-            
-            conn.commit()
-            logger.info("Database tables created successfully")
-            
-    except sqlite3.Error as e:
-        logger.error(f"Database initialization error: {str(e)}")
-        raise Exception(f"Failed to initialize database: {str(e)}")
+            # A writer left inside a transaction here would hold the write lock for good
+            in_transaction = writer.execute(lambda conn: conn.in_transaction)
+            logger.info(f"Database ready: writer in_transaction={in_transaction}, {READER_POOL_SIZE} readers, statement cache size {STATEMENT_CACHE_SIZE} per connection")
+        except sqlite3.Error as e:
+            logger.error(f"Database initialization error: {str(e)}")
+            raise Exception(f"Failed to initialize database: {str(e)}")
 
 def check_database_exists():
     """Check if database file exists"""
     return os.path.exists(DATABASE_PATH)
 
 def get_database_info():
-    """Get database information for debugging"""
-    try:
-        with get_db_context() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM tasks")
-            task_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
-            
-            return {
-                "database_path": DATABASE_PATH,
-                "database_exists": check_database_exists(),
-                "task_count": task_count,
-                "tables": tables
-            }
-    except sqlite3.Error as e:
-        logger.error(f"Error getting database info: {str(e)}")
-        return {"error": str(e)}
+    """Get database information for debugging, cached for DATABASE_INFO_TTL seconds"""
+    global _database_info, _database_info_refreshed_at
+    
+    with _database_info_lock:
+        if _database_info is not None and time.monotonic() - _database_info_refreshed_at < DATABASE_INFO_TTL:
+            return dict(_database_info)
+        
+        try:
+            with pooled_connection(reader_pool) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM tasks")
+                task_count = cursor.fetchone()[0]
+                
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                tables = [row[0] for row in cursor.fetchall()]
+                
+                _database_info = {
+                    "database_path": DATABASE_PATH,
+                    "database_exists": check_database_exists(),
+                    "task_count": task_count,
+                    "tables": tables
+                }
+                _database_info_refreshed_at = time.monotonic()
+                return dict(_database_info)
+        except sqlite3.Error as e:
+            logger.error(f"Error getting database info: {str(e)}")
+            return {"error": str(e)}
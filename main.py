@@ -1,17 +1,35 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 import uvicorn
-from typing import List, Optional
-from database import get_db, init_db, get_db_context
-from models import TaskModel
-from schemas import TaskCreate, TaskUpdate, TaskResponse, PaginatedTaskResponse, UserRegister, UserRegisterResponse, UserLogin, UserLoginResponse, CompletedTasksByCategoryResponse
+from typing import Any, Dict, Iterator, List, Optional
+import pydantic_core
+from database import get_db_reader, init_db, pooled_connection, reader_pool, writer
+import models
+from schemas import TaskCreate, TaskBulkCreate, TaskUpdate, TaskResponse, TaskStats, PaginatedTaskResponse, TaskPageResponse, UserRegister, UserRegisterResponse, UserLogin, UserLoginResponse, CompletedTasksByCategoryResponse
 import logging
-from contextlib import asynccontextmanager
+import os
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds between background sweeps of expired sessions
+SESSION_CLEANUP_INTERVAL = 300
+
+async def cleanup_sessions_periodically():
+    """Delete expired sessions every SESSION_CLEANUP_INTERVAL seconds, off the request path"""
+    while True:
+        await asyncio.sleep(SESSION_CLEANUP_INTERVAL)
+        try:
+            # The cleanup waits on the writer thread, so keep it off the event loop
+            await asyncio.to_thread(models.cleanup_expired_sessions)
+        except Exception as e:
+            logger.error(f"Periodic session cleanup failed: {str(e)}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for database initialization"""
@@ -20,34 +38,67 @@ async def lifespan(app: FastAPI):
         logger.info("Database initialized successfully")
         
         # Cleanup expired sessions on startup
-        with get_db_context() as db:
-            task_model = TaskModel(db)
-            deleted_count = task_model.cleanup_expired_sessions()
-            if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} expired sessions on startup")
+        deleted_count = models.cleanup_expired_sessions()
+        if deleted_count > 0:
+            logger.info(f"Cleaned up {deleted_count} expired sessions on startup")
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
         raise
+    cleanup_task = asyncio.create_task(cleanup_sessions_periodically())
     yield
+    cleanup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await cleanup_task
+    reader_pool.close_all()
+    writer.close()
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded by pydantic-core's compiled serializer instead of the stdlib json module"""
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+# HTTP caching for the public, rarely-changing endpoints
+ROOT_CACHE_CONTROL = "public, max-age=3600"
+STATS_CACHE_CONTROL = "public, max-age=15, stale-while-revalidate=60"
+
+# The root payload never changes at runtime, so it is built and encoded once at import
+ROOT_PAYLOAD = {
+    "message": "Task Management API",
+    "version": "1.0.0",
+    "endpoints": {
+        "create_task": "POST /task",
+        "create_tasks_bulk": "POST /tasks/bulk",
+        "update_task": "PUT /task",
+        "delete_task": "DELETE /task/{task_id}",
+        "get_all_tasks": "GET /tasks",
+        "get_user_tasks": "GET /tasks/user/{user_id}",
+        "get_completed_tasks_by_category": "GET /tasks/user/{user_id}/completed-by-category",
+        "get_completed_tasks_by_category_this_week": "GET /tasks/user/{user_id}/completed-by-category-this-week"
+    }
+}
+ROOT_BODY = pydantic_core.to_json(ROOT_PAYLOAD)
 
 app = FastAPI(
     title="Task Management API",
     description="A FastAPI-based task management system with SQLite database",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
-# Session validation dependency
-async def get_current_user(authorization: str = Header(None), db=Depends(get_db)) -> str:
-    """Validate session and return user ID"""
+# Endpoints and dependencies that touch SQLite are plain `def` so FastAPI runs
+# them in its threadpool and blocking sqlite3 calls never stall the event loop
+
+# Session validation dependencies
+def authenticate(authorization: Optional[str], db) -> str:
+    """Check a Bearer authorization header and return the session's user ID"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Valid session token is required")
     
     session_token = authorization.replace("Bearer ", "")
     
     try:
-        task_model = TaskModel(db)
-        user_id = task_model.validate_session(session_token)
+        user_id = models.validate_session(db, session_token)
         
         if not user_id:
             raise HTTPException(status_code=401, detail="Session expired or invalid")
@@ -59,33 +110,32 @@ async def get_current_user(authorization: str = Header(None), db=Depends(get_db)
         logger.error(f"Error validating session: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to validate session")
 
+def get_current_user(authorization: str = Header(None), db=Depends(get_db_reader)) -> str:
+    """Validate session and return user ID"""
+    return authenticate(authorization, db)
+
+def get_streaming_user(authorization: str = Header(None)) -> str:
+    """Validate session on a connection that is handed back before the handler runs"""
+    # Yield dependencies may be torn down before or after a streamed body is sent,
+    # depending on the FastAPI version, so streaming endpoints must not hold one
+    with pooled_connection(reader_pool) as db:
+        return authenticate(authorization, db)
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "Task Management API",
-        "version": "1.0.0",
-        "endpoints": {
-            "create_task": "POST /task",
-            "update_task": "PUT /task",
-            "delete_task": "DELETE /task/{task_id}",
-            "get_all_tasks": "GET /tasks",
-            "get_user_tasks": "GET /tasks/user/{user_id}",
-            "get_completed_tasks_by_category": "GET /tasks/user/{user_id}/completed-by-category",
-            "get_completed_tasks_by_category_this_week": "GET /tasks/user/{user_id}/completed-by-category-this-week"
-        }
-    }
+    # The payload only changes between deployments, so let clients and proxies keep it for an hour
+    return Response(content=ROOT_BODY, media_type="application/json", headers={"Cache-Control": ROOT_CACHE_CONTROL})
 
 @app.post("/task", response_model=TaskResponse)
-async def create_task(
+def create_task(
     task: TaskCreate, 
-    current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    current_user_id: str = Depends(get_current_user)
 ):
     """Create a new task"""
     try:
-        task_model = TaskModel(db)
-        task_id = task_model.create_task(
+        # INSERT ... RETURNING hands back the stored row, no follow-up SELECT needed
+        created_task = models.create_task(
             user_id=current_user_id,  # Use validated user ID from session
             task_name=task.taskName,
             category=task.category,
@@ -93,12 +143,7 @@ async def create_task(
             status=task.status
         )
         
-        # Retrieve the created task
-        created_task = task_model.get_task_by_id(task_id)
-        if not created_task:
-            raise HTTPException(status_code=500, detail="Failed to retrieve created task")
-        
-        logger.info(f"Task created successfully with ID: {task_id} for user: {current_user_id}")
+        logger.info(f"Task created successfully with ID: {created_task[0]} for user: {current_user_id}")
         return TaskResponse(
             taskId=created_task[0],
             userId=created_task[1],
@@ -111,27 +156,54 @@ async def create_task(
         logger.error(f"Error creating task: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}")
 
+async def read_task_bulk_body(request: Request) -> TaskBulkCreate:
+    """Parse and validate a bulk body in one pass through pydantic-core, without an intermediate dict"""
+    try:
+        return TaskBulkCreate.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)])
+
+# The body is read by read_task_bulk_body, so its schema is declared here for the docs;
+# the nested TaskCreate is already in the OpenAPI components through POST /task
+TASK_BULK_BODY_SCHEMA = TaskBulkCreate.model_json_schema(ref_template="#/components/schemas/{model}")
+TASK_BULK_BODY_SCHEMA.pop("$defs", None)
+TASK_BULK_REQUEST_BODY = {
+    "required": True,
+    "content": {"application/json": {"schema": TASK_BULK_BODY_SCHEMA}}
+}
+
+@app.post("/tasks/bulk", responses={200: {"model": List[TaskResponse]}}, openapi_extra={"requestBody": TASK_BULK_REQUEST_BODY})
+def create_tasks_bulk(
+    bulk: TaskBulkCreate = Depends(read_task_bulk_body),
+    current_user_id: str = Depends(get_current_user)
+):
+    """Create several tasks in a single transaction"""
+    try:
+        rows = [
+            (current_user_id, task.taskName, task.category, task.time, task.status)  # Use validated user ID from session
+            for task in bulk.tasks
+        ]
+        
+        # One executemany and one commit for the whole batch
+        created_tasks = models.create_tasks_bulk(rows)
+        
+        logger.info(f"Created {len(created_tasks)} tasks in bulk for user: {current_user_id}")
+        return FastJSONResponse(created_tasks)
+    except Exception as e:
+        logger.error(f"Error creating tasks in bulk: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to create tasks in bulk: {str(e)}")
+
 @app.put("/task", response_model=TaskResponse)
-async def update_task(
+def update_task(
     task: TaskUpdate, 
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
     """Update an existing task"""
     try:
-        task_model = TaskModel(db)
-        
-        # Check if task exists and belongs to current user
-        existing_task = task_model.get_task_by_id(task.taskId)
-        if not existing_task:
-            raise HTTPException(status_code=404, detail=f"Task with ID {task.taskId} not found")
-        
-        # Verify task ownership
-        if existing_task[1] != current_user_id:
-            raise HTTPException(status_code=403, detail="You can only update your own tasks")
-        
-        # Update task
-        success = task_model.update_task(
+        # Update task; ownership is part of the WHERE clause and
+        # UPDATE ... RETURNING hands back the updated row
+        updated_task = models.update_task(
             task_id=task.taskId,
             user_id=current_user_id,  # Use validated user ID from session
             task_name=task.taskName,
@@ -140,11 +212,12 @@ async def update_task(
             status=task.status
         )
         
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to update task")
+        if not updated_task:
+            # Nothing matched: tell a missing task apart from another user's task
+            if models.task_exists(db, task.taskId):
+                raise HTTPException(status_code=403, detail="You can only update your own tasks")
+            raise HTTPException(status_code=404, detail=f"Task with ID {task.taskId} not found")
         
-        # Retrieve updated task
-        updated_task = task_model.get_task_by_id(task.taskId)
         logger.info(f"Task updated successfully with ID: {task.taskId} for user: {current_user_id}")
         
         return TaskResponse(
@@ -162,29 +235,21 @@ async def update_task(
         raise HTTPException(status_code=500, detail=f"Failed to update task: {str(e)}")
 
 @app.delete("/task/{task_id}")
-async def delete_task(
+def delete_task(
     task_id: int, 
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
     """Delete a task by ID"""
     try:
-        task_model = TaskModel(db)
-        
-        # Check if task exists and belongs to current user
-        existing_task = task_model.get_task_by_id(task_id)
-        if not existing_task:
+        # Delete task; ownership is part of the WHERE clause
+        deleted_count = models.delete_task(task_id, current_user_id)
+        if deleted_count == 0:
+            # Nothing matched: tell a missing task apart from another user's task
+            if models.task_exists(db, task_id):
+                raise HTTPException(status_code=403, detail="You can only delete your own tasks")
             raise HTTPException(status_code=404, detail=f"Task with ID {task_id} not found")
         
-        # Verify task ownership
-        if existing_task[1] != current_user_id:
-            raise HTTPException(status_code=403, detail="You can only delete your own tasks")
-        
-        # Delete task
-        success = task_model.delete_task(task_id)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to delete task")
-        
         logger.info(f"Task deleted successfully with ID: {task_id} by user: {current_user_id}")
         return {"message": f"Task with ID {task_id} deleted successfully"}
     except HTTPException:
@@ -193,39 +258,53 @@ async def delete_task(
         logger.error(f"Error deleting task: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete task: {str(e)}")
 
-@app.get("/tasks", response_model=List[TaskResponse])
-async def get_all_tasks(
+def build_task_page(tasks: List[Dict], limit: int) -> FastJSONResponse:
+    """Build a task page from up to limit + 1 rows; the extra row only signals that another page exists"""
+    page_tasks = tasks[:limit]
+    
+    next_cursor = None
+    if len(tasks) > limit:
+        last_task = page_tasks[-1]
+        next_cursor = {"before_time": last_task["time"], "before_id": last_task["taskId"]}
+    
+    # Rows come straight from the tasks table and were validated on the way in,
+    # so serialize them as-is instead of re-validating through response_model
+    return FastJSONResponse({"tasks": page_tasks, "next_cursor": next_cursor})
+
+def validate_task_cursor(before_time: Optional[str], before_id: Optional[int]):
+    """Ensure both halves of a keyset cursor are given together"""
+    if (before_time is None) != (before_id is None):
+        raise HTTPException(status_code=400, detail="before_time and before_id must be provided together")
+
+@app.get("/tasks", responses={200: {"model": TaskPageResponse}})
+def get_all_tasks(
+    limit: int = Query(50, ge=1, le=500),
+    before_time: Optional[str] = None,
+    before_id: Optional[int] = None,
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
-    """Get all tasks sorted by time in descending order"""
+    """Get a page of tasks sorted by time in descending order"""
     try:
-        task_model = TaskModel(db)
-        tasks = task_model.get_all_tasks()
-        
-        task_list = []
-        for task in tasks:
-            task_list.append(TaskResponse(
-                taskId=task[0],
-                userId=task[1],
-                taskName=task[2],
-                category=task[3],
-                time=task[4],
-                status=task[5]
-            ))
+        validate_task_cursor(before_time, before_id)
+        
+        # Fetch one extra row to know whether there is a next page
+        tasks = models.get_tasks_page(db, limit + 1, before_time, before_id)
         
-        logger.info(f"Retrieved {len(task_list)} tasks for user: {current_user_id}")
-        return task_list
+        logger.info(f"Retrieved {min(len(tasks), limit)} tasks for user: {current_user_id}")
+        return build_task_page(tasks, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve tasks: {str(e)}")
 
 @app.get("/tasks/paginated", response_model=PaginatedTaskResponse)
-async def get_all_tasks_paginated(
+def get_all_tasks_paginated(
     page: int = 1,
     page_size: int = 20,
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
     """Get paginated tasks sorted by time in descending order"""
     try:
@@ -235,79 +314,55 @@ async def get_all_tasks_paginated(
         if page_size < 1 or page_size > 100:
             raise HTTPException(status_code=400, detail="Page size must be between 1 and 100")
         
-        task_model = TaskModel(db)
-        
         # Calculate offset
         offset = (page - 1) * page_size
         
         # Get paginated tasks
-        tasks = task_model.get_all_tasks_paginated(offset=offset, limit=page_size)
+        tasks = models.get_all_tasks_paginated(db, offset=offset, limit=page_size)
         
         # Get total count for pagination info
-        total_count = task_model.get_task_count()
+        total_count = models.get_task_count(db)
         
-        # Calculate pagination info
-        total_pages = (total_count + page_size - 1) // page_size
-        has_next = page < total_pages
-        has_previous = page > 1
-        
-        # Convert to response format
-        task_list = []
-        for task in tasks:
-            task_list.append(TaskResponse(
-                taskId=task[0],
-                userId=task[1],
-                taskName=task[2],
-                category=task[3],
-                time=task[4],
-                status=task[5]
-            ))
-        
-        logger.info(f"Retrieved {len(task_list)} tasks (page {page}/{total_pages}) for user: {current_user_id}")
-        
-        return PaginatedTaskResponse(
-            tasks=task_list,
+        # Validate the page in one pass through pydantic-core and serialize it with the
+        # model's prebuilt serializer, so FastAPI does not validate it a second time
+        paginated = PaginatedTaskResponse(
+            tasks=tasks,
             total_count=total_count,
             page=page,
-            page_size=page_size,
-            total_pages=total_pages,
-            has_next=has_next,
-            has_previous=has_previous
+            page_size=page_size
         )
+        
+        logger.info(f"Retrieved {len(tasks)} tasks (page {page}/{paginated.total_pages}) for user: {current_user_id}")
+        
+        return FastJSONResponse(paginated)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error retrieving paginated tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve paginated tasks: {str(e)}")
 
-@app.get("/tasks/user/{user_id}", response_model=List[TaskResponse])
-async def get_user_tasks(
+@app.get("/tasks/user/{user_id}", responses={200: {"model": TaskPageResponse}})
+def get_user_tasks(
     user_id: str, 
+    limit: int = Query(50, ge=1, le=500),
+    before_time: Optional[str] = None,
+    before_id: Optional[int] = None,
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
-    """Get all tasks for a specific user sorted by time in descending order"""
+    """Get a page of tasks for a specific user sorted by time in descending order"""
     try:
         # Ensure users can only access their own tasks
         if user_id != current_user_id:
             raise HTTPException(status_code=403, detail="You can only access your own tasks")
         
-        task_model = TaskModel(db)
-        tasks = task_model.get_tasks_by_user(user_id)
-        
-        task_list = []
-        for task in tasks:
-            task_list.append(TaskResponse(
-                taskId=task[0],
-                userId=task[1],
-                taskName=task[2],
-                category=task[3],
-                time=task[4],
-                status=task[5]
-            ))
+        validate_task_cursor(before_time, before_id)
         
-        logger.info(f"Retrieved {len(task_list)} tasks for user {user_id}")
-        return task_list
+        # Fetch one extra row to know whether there is a next page
+        tasks = models.get_tasks_by_user_page(db, user_id, limit + 1, before_time, before_id)
+        
+        logger.info(f"Retrieved {min(len(tasks), limit)} tasks for user {user_id}")
+        return build_task_page(tasks, limit)
     except HTTPException:
         raise
     except Exception as e:
@@ -315,12 +370,12 @@ async def get_user_tasks(
         raise HTTPException(status_code=500, detail=f"Failed to retrieve tasks for user: {str(e)}")
 
 @app.get("/tasks/user/{user_id}/paginated", response_model=PaginatedTaskResponse)
-async def get_user_tasks_paginated(
+def get_user_tasks_paginated(
     user_id: str,
     page: int = 1,
     page_size: int = 20,
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
     """Get paginated tasks for a specific user sorted by time in descending order"""
     try:
@@ -334,58 +389,55 @@ async def get_user_tasks_paginated(
         if page_size < 1 or page_size > 100:
             raise HTTPException(status_code=400, detail="Page size must be between 1 and 100")
         
-        task_model = TaskModel(db)
-        
         # Calculate offset
         offset = (page - 1) * page_size
         
         # Get paginated tasks for user
-        tasks = task_model.get_tasks_by_user_paginated(user_id, offset=offset, limit=page_size)
+        tasks = models.get_tasks_by_user_paginated(db, user_id, offset=offset, limit=page_size)
         
         # Get total count for pagination info
-        total_count = task_model.get_user_task_count(user_id)
+        total_count = models.get_user_task_count(db, user_id)
         
-        # Calculate pagination info
-        total_pages = (total_count + page_size - 1) // page_size
-        has_next = page < total_pages
-        has_previous = page > 1
-        
-        # Convert to response format
-        task_list = []
-        for task in tasks:
-            task_list.append(TaskResponse(
-                taskId=task[0],
-                userId=task[1],
-                taskName=task[2],
-                category=task[3],
-                time=task[4],
-                status=task[5]
-            ))
-        
-        logger.info(f"Retrieved {len(task_list)} tasks (page {page}/{total_pages}) for user {user_id}")
-        
-        return PaginatedTaskResponse(
-            tasks=task_list,
+        # Validate the page in one pass through pydantic-core and serialize it with the
+        # model's prebuilt serializer, so FastAPI does not validate it a second time
+        paginated = PaginatedTaskResponse(
+            tasks=tasks,
             total_count=total_count,
             page=page,
-            page_size=page_size,
-            total_pages=total_pages,
-            has_next=has_next,
-            has_previous=has_previous
+            page_size=page_size
         )
+        
+        logger.info(f"Retrieved {len(tasks)} tasks (page {page}/{paginated.total_pages}) for user {user_id}")
+        
+        return FastJSONResponse(paginated)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error retrieving paginated tasks for user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve paginated tasks for user: {str(e)}")
 
-@app.get("/tasks/user/{user_id}/month/{year}/{month}", response_model=List[TaskResponse])
-async def get_user_tasks_by_month(
+def stream_user_tasks_by_month(user_id: str, year: int, month: int) -> Iterator[bytes]:
+    """Encode a user's tasks for a month as a JSON array, one batch of rows at a time"""
+    # The stream outlives the handler, so it borrows a connection for exactly as long as it reads
+    with pooled_connection(reader_pool) as db:
+        yield b"["
+        separator = b""
+        task_count = 0
+        for batch in models.iter_user_tasks_by_month(db, user_id, year, month):
+            # Encode the batch as one array and splice its items into the stream
+            yield separator + pydantic_core.to_json(batch)[1:-1]
+            separator = b","
+            task_count += len(batch)
+        yield b"]"
+    
+    logger.info(f"Retrieved {task_count} tasks for user {user_id} in {year}-{month}")
+
+@app.get("/tasks/user/{user_id}/month/{year}/{month}", responses={200: {"model": List[TaskResponse]}})
+def get_user_tasks_by_month(
     user_id: str,
     year: int,
     month: int,
-    current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    current_user_id: str = Depends(get_streaming_user)
 ):
     """Get all tasks for a specific user in a specific month"""
     try:
@@ -399,26 +451,9 @@ async def get_user_tasks_by_month(
         if year < 1900 or year > 2100:
             raise HTTPException(status_code=400, detail="Year must be between 1900 and 2100")
         
-        task_model = TaskModel(db)
-        
-        # Get tasks for the specified month
-        tasks = task_model.get_user_tasks_by_month(user_id, year, month)
-        
-        # Convert to response format
-        task_list = []
-        for task in tasks:
-            task_list.append(TaskResponse(
-                taskId=task[0],
-                userId=task[1],
-                taskName=task[2],
-                category=task[3],
-                time=task[4],
-                status=task[5]
-            ))
-        
-        logger.info(f"Retrieved {len(task_list)} tasks for user {user_id} in {year}-{month}")
-        
-        return task_list
+        # A month is not paginated, so stream it rather than holding every row and the whole JSON body in memory.
+        # get_streaming_user has already returned its connection, so the stream never holds two
+        return StreamingResponse(stream_user_tasks_by_month(user_id, year, month), media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -426,26 +461,22 @@ async def get_user_tasks_by_month(
         raise HTTPException(status_code=500, detail=f"Failed to retrieve tasks for user in month: {str(e)}")
 
 @app.post("/register", response_model=UserRegisterResponse, status_code=201)
-async def register_user(user: UserRegister, db=Depends(get_db)):
+def register_user(user: UserRegister):
     """Register a new user"""
     try:
-        task_model = TaskModel(db)
-        user_id = task_model.add_new_member(
+        # INSERT ... RETURNING hands back the stored member, no follow-up SELECT needed
+        user_details = models.add_new_member(
             email=user.email,
             relationship=user.relationship,
             password=user.password,
             gender=user.gender,
             nickname=user.nickname,
-            birth=user.birthday
+            birth=user.birthday.isoformat()
         )
+        user_id = user_details[0]
         
         # Create new session for the user after successful registration
-        session_info = task_model.create_session(user_id)
-        
-        # Get user details for response
-        user_details = task_model.get_user_by_id(user_id)
-        if not user_details:
-            raise HTTPException(status_code=500, detail="Failed to retrieve user details after registration")
+        session_info = models.create_session(user_id)
         
         logger.info(f"User registered successfully with ID: {user_id}")
         return UserRegisterResponse(
@@ -468,23 +499,21 @@ async def register_user(user: UserRegister, db=Depends(get_db)):
             raise HTTPException(status_code=500, detail=f"Failed to register user: {error_message}")
 
 @app.post("/login", response_model=UserLoginResponse)
-async def login_user(user: UserLogin, db=Depends(get_db)):
+def login_user(user: UserLogin, db=Depends(get_db_reader)):
     """Login user with email and password"""
     try:
-        task_model = TaskModel(db)
-        user_id = task_model.getUser(
+        # The credential check returns the member details, no follow-up SELECT needed
+        user_details = models.getUser(
+            db,
             email=user.email,
             password=user.password
         )
         
-        if user_id:
-            # Create new session for the user
-            session_info = task_model.create_session(user_id)
+        if user_details:
+            user_id = user_details[0]
             
-            # Get user details for response
-            user_details = task_model.get_user_by_id(user_id)
-            if not user_details:
-                raise HTTPException(status_code=500, detail="Failed to retrieve user details after login")
+            # Create new session for the user
+            session_info = models.create_session(user_id)
             
             logger.info(f"User logged in successfully: {user_id}")
             return UserLoginResponse(
@@ -508,32 +537,23 @@ async def login_user(user: UserLogin, db=Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to login: {str(e)}")
 
 @app.post("/logout")
-async def logout_user(session_token: str, db=Depends(get_db)):
+def logout_user(current_user_id: str = Depends(get_current_user)):
     """Logout user by invalidating their session"""
     try:
-        task_model = TaskModel(db)
-        user_id = task_model.validate_session(session_token)
-        
-        if user_id:
-            # Delete the session
-            task_model.delete_session(user_id)
-            logger.info(f"User logged out successfully: {user_id}")
-            return {"message": "Logout successful"}
-        else:
-            raise HTTPException(status_code=401, detail="Invalid session token")
-            
-    except HTTPException:
-        raise
+        # get_current_user already validated the bearer token (usually from the session cache),
+        # so only the DELETE is left; it also drops the user's cached sessions
+        models.delete_session(current_user_id)
+        logger.info(f"User logged out successfully: {current_user_id}")
+        return {"message": "Logout successful"}
     except Exception as e:
         logger.error(f"Error during logout: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to logout: {str(e)}")
 
 @app.get("/session/validate")
-async def validate_session(session_token: str, db=Depends(get_db)):
+def validate_session(session_token: str, db=Depends(get_db_reader)):
     """Validate a session token"""
     try:
-        task_model = TaskModel(db)
-        user_id = task_model.validate_session(session_token)
+        user_id = models.validate_session(db, session_token)
         
         if user_id:
             logger.info(f"Session validated for user: {user_id}")
@@ -546,34 +566,49 @@ async def validate_session(session_token: str, db=Depends(get_db)):
         logger.error(f"Error validating session: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to validate session: {str(e)}")
 
-@app.get("/stats")
-async def get_task_stats(db=Depends(get_db)):
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque_tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque_tag:
+            return True
+    return False
+
+@app.get("/stats", responses={200: {"model": TaskStats}})
+def get_task_stats(if_none_match: Optional[str] = Header(None), db=Depends(get_db_reader)):
     """Get task statistics"""
     try:
-        task_model = TaskModel(db)
-        total_tasks = task_model.get_task_count()
-        
-        # Get tasks by status
-        pending_tasks = len(task_model.get_tasks_by_status("pending"))
-        in_progress_tasks = len(task_model.get_tasks_by_status("in_progress"))
-        completed_tasks = len(task_model.get_tasks_by_status("completed"))
-        
-        return {
-            "total_tasks": total_tasks,
-            "pending_tasks": pending_tasks,
-            "in_progress_tasks": in_progress_tasks,
-            "completed_tasks": completed_tasks
+        # One grouped query instead of a COUNT plus a full fetch per status
+        status_counts = models.get_status_counts(db)
+        
+        stats = {
+            "total_tasks": sum(status_counts.values()),
+            "pending_tasks": status_counts.get("pending", 0),
+            "in_progress_tasks": status_counts.get("in_progress", 0),
+            "completed_tasks": status_counts.get("completed", 0)
         }
+        
+        # The counts are the whole payload, so they double as its ETag
+        etag = '"{total_tasks}-{pending_tasks}-{in_progress_tasks}-{completed_tasks}"'.format(**stats)
+        headers = {"ETag": etag, "Cache-Control": STATS_CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        return FastJSONResponse(stats, headers=headers)
     except Exception as e:
         logger.error(f"Error getting task stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get task stats: {str(e)}")
 
 @app.get("/tasks/completed-by-category", response_model=List[CompletedTasksByCategoryResponse])
-async def get_completed_tasks_by_category_all(db=Depends(get_db)):
+def get_completed_tasks_by_category_all(db=Depends(get_db_reader)):
     """Get count of completed tasks by category across all users"""
     try:
-        task_model = TaskModel(db)
-        completed_tasks_by_category = task_model.get_completed_tasks_by_category_all_users()
+        completed_tasks_by_category = models.get_completed_tasks_by_category_all_users(db)
         
         # Convert to response format
         result = []
@@ -590,10 +625,10 @@ async def get_completed_tasks_by_category_all(db=Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to retrieve completed tasks by category: {str(e)}")
 
 @app.get("/tasks/user/{user_id}/completed-by-category-this-week", response_model=List[CompletedTasksByCategoryResponse])
-async def get_completed_tasks_by_category_this_week(
+def get_completed_tasks_by_category_this_week(
     user_id: str,
     current_user_id: str = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_reader)
 ):
     """Get count of completed tasks by category for a specific user for the current week"""
     try:
@@ -601,8 +636,7 @@ async def get_completed_tasks_by_category_this_week(
         if user_id != current_user_id:
             raise HTTPException(status_code=403, detail="You can only access your own tasks")
         
-        task_model = TaskModel(db)
-        completed_tasks_by_category = task_model.get_completed_tasks_by_category_this_week_for_user(user_id)
+        completed_tasks_by_category = models.get_completed_tasks_by_category_this_week_for_user(db, user_id)
         
         # Convert to response format
         result = []
@@ -624,17 +658,25 @@ async def get_completed_tasks_by_category_this_week(
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled exceptions"""
     logger.error(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={"detail": "Internal server error occurred"}
     )
 
 if __name__ == "__main__":
     # Run with HTTPS using local self-signed certificate (for development only)
+    # A single worker by default; each extra worker gets its own reader pool, writer thread and caches
+    workers = int(os.getenv("UVICORN_WORKERS", 1))
+    if workers > 1:
+        # Per-process session caches would let a logout go unnoticed by the other workers
+        os.environ.setdefault("SESSION_CACHE_TTL", "0")
     uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8443,
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 8443)),
+        workers=workers,
+        access_log=os.getenv("UVICORN_ACCESS_LOG", "0") == "1",
+        log_level="warning",
         ssl_keyfile="certs/localhost.key",
         ssl_certfile="certs/localhost.crt",
     )
@@ -1,449 +1,722 @@
 import sqlite3
-from typing import List, Optional, Tuple
+import functools
+import hashlib
+import hmac
+import os
+import time
+import uuid
+import jwt
+from typing import Dict, Final, Iterator, List, Optional, Tuple
 import logging
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
+from database import writer
+from cache import MISSING, TTLCache
 
+# Per-operation messages are logged at DEBUG with lazy %s arguments, so hot
+# paths pay no formatting cost unless debug logging is switched on
 logger = logging.getLogger(__name__)
 
-class TaskModel:
-    """Task model for database operations"""
-    
-    def __init__(self, db_connection):
-        self.db = db_connection
-    
-    def create_task(self, user_id: str, task_name: str, category: str, time: str, status: str) -> int:
-        """Create a new task and return its ID"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                INSERT INTO tasks (userId, taskName, category, time, status, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user_id, task_name, category, time, status, datetime.now().isoformat()))
-            
-            self.db.commit()
-            task_id = cursor.lastrowid
-            logger.info(f"Created task with ID: {task_id}")
-            return task_id
-        except sqlite3.Error as e:
-            logger.error(f"Error creating task: {str(e)}")
-            raise Exception(f"Failed to create task: {str(e)}")
-    
-    def get_task_by_id(self, task_id: int) -> Optional[Tuple]:
-        """Get a task by its ID"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                WHERE taskId = ?
-            ''', (task_id,))
-            
-            result = cursor.fetchone()
-            if result:
-                return tuple(result)
+# All SQL is kept as module constants so the sqlite3 statement cache always
+# sees the exact same string object and skips re-parsing; user data is only
+# ever passed as ? parameters. Hot single-shot queries run on the connection's
+# shared_cursor instead of allocating a cursor per call; that is safe because a
+# connection serves one request at a time and those queries fetch everything
+# before returning
+SQL_INSERT_TASK: Final[str] = '''
+    INSERT INTO tasks (userId, taskName, category, time, status)
+    VALUES (?, ?, ?, ?, ?)
+    RETURNING taskId, userId, taskName, category, time, status
+'''
+
+# Batch insert for executemany; it has no RETURNING clause, so the rows are
+# read back afterwards by their ID range
+SQL_INSERT_TASKS_BULK: Final[str] = 'INSERT INTO tasks (userId, taskName, category, time, status) VALUES (?, ?, ?, ?, ?)'
+
+SQL_LAST_INSERT_ID: Final[str] = 'SELECT last_insert_rowid()'
+
+SQL_SELECT_TASK_ID_RANGE: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE taskId BETWEEN ? AND ?
+    ORDER BY taskId
+'''
+
+SQL_TASK_EXISTS: Final[str] = 'SELECT 1 FROM tasks WHERE taskId = ?'
+
+# updated_at is stamped by SQLite itself (the column DEFAULT on insert,
+# CURRENT_TIMESTAMP here), so writes do no Python datetime work
+SQL_UPDATE_TASK: Final[str] = '''
+    UPDATE tasks
+    SET taskName = ?, category = ?, time = ?, status = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE taskId = ? AND userId = ?
+    RETURNING taskId, userId, taskName, category, time, status
+'''
+
+SQL_DELETE_TASK: Final[str] = 'DELETE FROM tasks WHERE taskId = ? AND userId = ?'
+
+# Keyset pagination: rows are ordered by (time, taskId) so a page can resume
+# strictly after the last row of the previous one with an index range scan
+SQL_SELECT_TASKS_PAGE: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    ORDER BY time DESC, taskId DESC
+    LIMIT ?
+'''
+
+SQL_SELECT_TASKS_PAGE_BEFORE: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE (time, taskId) < (?, ?)
+    ORDER BY time DESC, taskId DESC
+    LIMIT ?
+'''
+
+SQL_SELECT_USER_TASKS_PAGE: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE userId = ?
+    ORDER BY time DESC, taskId DESC
+    LIMIT ?
+'''
+
+SQL_SELECT_USER_TASKS_PAGE_BEFORE: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE userId = ? AND (time, taskId) < (?, ?)
+    ORDER BY time DESC, taskId DESC
+    LIMIT ?
+'''
+
+SQL_COUNT_TASKS: Final[str] = 'SELECT COUNT(*) FROM tasks'
+
+SQL_SELECT_TASKS_OFFSET: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    ORDER BY time DESC
+    LIMIT ? OFFSET ?
+'''
+
+SQL_SELECT_USER_TASKS_OFFSET: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE userId = ?
+    ORDER BY time DESC
+    LIMIT ? OFFSET ?
+'''
+
+SQL_SELECT_TASKS_BY_CATEGORY: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE category = ?
+    ORDER BY time DESC
+'''
+
+SQL_COUNT_USER_TASKS: Final[str] = 'SELECT COUNT(*) FROM tasks WHERE userId = ?'
+
+SQL_COUNT_TASKS_BY_STATUS: Final[str] = '''
+    SELECT status, COUNT(*)
+    FROM tasks
+    GROUP BY status
+'''
+
+SQL_INSERT_MEMBER: Final[str] = '''
+    INSERT INTO members (userId, email, relationship, nickname, gender, birthday, password)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING userId, email, relationship, nickname, gender, birthday
+'''
+
+# Looked up by email alone through its unique index; the password hash is
+# checked in Python
+SQL_SELECT_MEMBER_LOGIN: Final[str] = '''
+    SELECT userId, email, relationship, nickname, gender, birthday, password
+    FROM members
+    WHERE email = ?
+'''
+
+SQL_UPDATE_MEMBER_PASSWORD: Final[str] = 'UPDATE members SET password = ?, updated_at = CURRENT_TIMESTAMP WHERE userId = ?'
+
+SQL_DELETE_USER_SESSIONS: Final[str] = 'DELETE FROM sessions WHERE userId = ?'
+
+# One session per user: a new login replaces the old row in a single write
+SQL_UPSERT_SESSION: Final[str] = '''
+    INSERT INTO sessions (sessionId, userId, sessionToken, expiresAt)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(userId) DO UPDATE SET
+        sessionId = excluded.sessionId,
+        sessionToken = excluded.sessionToken,
+        expiresAt = excluded.expiresAt,
+        created_at = CURRENT_TIMESTAMP
+'''
+
+SQL_SELECT_SESSION_USER: Final[str] = '''
+    SELECT userId, expiresAt
+    FROM sessions
+    WHERE sessionToken = ? AND expiresAt > ?
+'''
+
+# Deletes at most ? expired sessions, so cleanup never holds the write lock for long;
+# a subquery stands in for DELETE ... LIMIT, which stock SQLite builds lack
+SQL_DELETE_EXPIRED_SESSIONS_BATCH: Final[str] = '''
+    DELETE FROM sessions
+    WHERE sessionToken IN (
+        SELECT sessionToken FROM sessions WHERE expiresAt <= ? LIMIT ?
+    )
+'''
+
+# Date filters compare the raw ISO time text against [start, end) bounds built
+# in Python, so idx_tasks_user_time can serve them as a range scan
+SQL_SELECT_USER_TASKS_BY_MONTH: Final[str] = '''
+    SELECT taskId, userId, taskName, category, time, status
+    FROM tasks
+    WHERE userId = ? AND time >= ? AND time < ?
+    ORDER BY time DESC
+'''
+
+SQL_COUNT_COMPLETED_BY_CATEGORY_FOR_USER: Final[str] = '''
+    SELECT category, COUNT(*) as count
+    FROM tasks
+    WHERE userId = ? AND status = 'completed'
+    GROUP BY category
+    ORDER BY count DESC
+'''
+
+SQL_COUNT_COMPLETED_BY_CATEGORY: Final[str] = '''
+    SELECT category, COUNT(*) as count
+    FROM tasks
+    WHERE status = 'completed'
+    GROUP BY category
+    ORDER BY count DESC
+'''
+
+SQL_COUNT_COMPLETED_BY_CATEGORY_THIS_WEEK_FOR_USER: Final[str] = '''
+    SELECT category, COUNT(*) as count
+    FROM tasks
+    WHERE userId = ? AND status = 'completed'
+    AND time >= ? AND time < ?
+    GROUP BY category
+    ORDER BY count DESC
+'''
+
+# scrypt cost for stored password hashes: 16 MB of memory per hash (128 * r * n)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PASSWORD_SALT_BYTES = 16
+PASSWORD_HASH_PREFIX = f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$"
+
+# Read once at import instead of on every login
+JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key")
+JWT_ALGORITHM = "HS256"
+SESSION_LIFETIME_SECONDS = 24 * 60 * 60 * 365 * 5
+
+# Rows fetched from the cursor per chunk when streaming a result set
+STREAM_BATCH_SIZE = 200
+
+# Session token -> user ID, so authenticated requests skip the sessions lookup;
+# entries are dropped on login/logout and never outlive the session itself.
+# The cache is per process, so set SESSION_CACHE_TTL=0 when running several workers
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", 60))
+session_cache = TTLCache(maxsize=10_000, ttl=SESSION_CACHE_TTL)
+
+# Expired sessions removed per write transaction during cleanup
+SESSION_CLEANUP_BATCH_SIZE = 1000
+
+# Task totals for the OFFSET-paginated endpoints, so paging through a list
+# does not re-count the table on every page; writes that add or remove tasks
+# drop the affected entries
+COUNT_CACHE_TTL = 30
+count_cache = TTLCache(maxsize=10_000, ttl=COUNT_CACHE_TTL)
+ALL_TASKS_COUNT_KEY = "v1:count:tasks"
+
+def user_task_count_key(user_id: str) -> str:
+    """Get the count cache key for a user's task total"""
+    return f"v1:count:tasks:{user_id}"
+
+def invalidate_task_counts(user_id: str):
+    """Drop the cached totals a task insert or delete for the user makes stale"""
+    count_cache.delete(ALL_TASKS_COUNT_KEY)
+    count_cache.delete(user_task_count_key(user_id))
+
+def month_bounds(year: int, month: int) -> Tuple[str, str]:
+    """Get the [start, end) date strings covering a calendar month"""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+def current_week_bounds() -> Tuple[str, str]:
+    """Get the [start, end) date strings of the current Monday-based week in UTC"""
+    # Clip to the calendar year, matching how strftime('%Y-%W', 'now') groups days
+    today = datetime.now(timezone.utc).date()
+    monday = today - timedelta(days=today.weekday())
+    start = max(monday, date(today.year, 1, 1))
+    end = min(monday + timedelta(days=7), date(today.year + 1, 1, 1))
+    return start.isoformat(), end.isoformat()
+
+def hash_password(password: str) -> str:
+    """Hash a password with scrypt and a random salt, in the form stored in members.password"""
+    salt = os.urandom(PASSWORD_SALT_BYTES)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return f"{PASSWORD_HASH_PREFIX}{salt.hex()}${digest.hex()}"
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check a password against a stored scrypt hash, or a plaintext value not yet migrated"""
+    if not stored.startswith("scrypt$"):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, n, r, p, salt_hex, digest_hex = stored.split("$")
+    digest = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt_hex), n=int(n), r=int(r), p=int(p), dklen=len(digest_hex) // 2)
+    return hmac.compare_digest(digest, bytes.fromhex(digest_hex))
+
+def password_needs_rehash(stored: str) -> bool:
+    """Check whether a stored password is plaintext or hashed with outdated scrypt parameters"""
+    return not stored.startswith(PASSWORD_HASH_PREFIX)
+
+# Verified against when the email is unknown, so a miss costs as much as a wrong password
+DUMMY_PASSWORD_HASH = hash_password("")
+
+def on_writer_thread(method):
+    """Run a write function on the writer thread, passing it the read-write connection as db"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        return writer.execute(lambda conn: method(conn, *args, **kwargs))
+    return wrapper
+
+@on_writer_thread
+def create_task(db, user_id: str, task_name: str, category: str, time: str, status: str) -> sqlite3.Row:
+    """Create a new task and return the stored row"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_INSERT_TASK, (user_id, task_name, category, time, status))
+        created_task = cursor.fetchone()
+        
+        db.commit()
+        invalidate_task_counts(user_id)
+        logger.debug("Created task with ID: %s", created_task[0])
+        return created_task
+    except sqlite3.Error as e:
+        logger.error(f"Error creating task: {str(e)}")
+        raise Exception(f"Failed to create task: {str(e)}")
+
+@on_writer_thread
+def create_tasks_bulk(db, rows: List[Tuple]) -> List[Dict]:
+    """Create several (userId, taskName, category, time, status) tasks in one transaction and return the stored rows"""
+    try:
+        cursor = db.cursor()
+        cursor.executemany(SQL_INSERT_TASKS_BULK, rows)
+        
+        # Only the writer thread inserts, and it holds the write lock until commit,
+        # so this batch was given consecutive IDs ending at last_insert_rowid()
+        cursor.execute(SQL_LAST_INSERT_ID)
+        last_id = cursor.fetchone()[0]
+        cursor.execute(SQL_SELECT_TASK_ID_RANGE, (last_id - len(rows) + 1, last_id))
+        created_tasks = [dict(row) for row in cursor.fetchall()]
+        
+        db.commit()
+        for user_id in {row[0] for row in rows}:
+            invalidate_task_counts(user_id)
+        logger.debug("Created %s tasks in bulk", len(created_tasks))
+        return created_tasks
+    except sqlite3.Error as e:
+        logger.error(f"Error creating tasks in bulk: {str(e)}")
+        raise Exception(f"Failed to create tasks in bulk: {str(e)}")
+
+def task_exists(db, task_id: int) -> bool:
+    """Check whether a task exists, without reading its columns"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_TASK_EXISTS, (task_id,))
+        return cursor.fetchone() is not None
+    except sqlite3.Error as e:
+        logger.error(f"Error checking task ID {task_id}: {str(e)}")
+        raise Exception(f"Failed to check task: {str(e)}")
+
+@on_writer_thread
+def update_task(db, task_id: int, user_id: str, task_name: str, category: str, time: str, status: str) -> Optional[sqlite3.Row]:
+    """Update a task owned by the given user and return the updated row"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_UPDATE_TASK, (task_name, category, time, status, task_id, user_id))
+        updated_task = cursor.fetchone()
+        
+        db.commit()
+        
+        if not updated_task:
+            logger.warning("No task found with ID %s for user %s", task_id, user_id)
             return None
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching task by ID {task_id}: {str(e)}")
-            raise Exception(f"Failed to fetch task: {str(e)}")
-    
-    def update_task(self, task_id: int, user_id: str, task_name: str, category: str, time: str, status: str) -> bool:
-        """Update an existing task"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                UPDATE tasks
-                SET userId = ?, taskName = ?, category = ?, time = ?, status = ?, updated_at = ?
-                WHERE taskId = ?
-            ''', (user_id, task_name, category, time, status, datetime.now().isoformat(), task_id))
-            
-            self.db.commit()
-            
-            if cursor.rowcount == 0:
-                logger.warning(f"No task found with ID: {task_id}")
-                return False
-            
-            logger.info(f"Updated task with ID: {task_id}")
-            return True
-        except sqlite3.Error as e:
-            logger.error(f"Error updating task {task_id}: {str(e)}")
-            raise Exception(f"Failed to update task: {str(e)}")
-    
-    def delete_task(self, task_id: int) -> bool:
-        """Delete a task by its ID"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('DELETE FROM tasks WHERE taskId = ?', (task_id,))
-            
-            self.db.commit()
-            
-            if cursor.rowcount == 0:
-                logger.warning(f"No task found with ID: {task_id}")
-                return False
-            
-            logger.info(f"Deleted task with ID: {task_id}")
-            return True
-        except sqlite3.Error as e:
-            logger.error(f"Error deleting task {task_id}: {str(e)}")
-            raise Exception(f"Failed to delete task: {str(e)}")
-    
-    def get_all_tasks(self) -> List[Tuple]:
-        """Get all tasks sorted by time in descending order"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                ORDER BY time DESC
-            ''')
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching all tasks: {str(e)}")
-            raise Exception(f"Failed to fetch all tasks: {str(e)}")
-    
-    def get_all_tasks_paginated(self, offset: int = 0, limit: int = 20) -> List[Tuple]:
-        """Get all tasks with pagination sorted by time in descending order"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                ORDER BY time DESC
-                LIMIT ? OFFSET ?
-            ''', (limit, offset))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching paginated tasks: {str(e)}")
-            raise Exception(f"Failed to fetch paginated tasks: {str(e)}")
-    
-    def get_tasks_by_user_paginated(self, user_id: str, offset: int = 0, limit: int = 20) -> List[Tuple]:
-        """Get paginated tasks for a specific user sorted by time in descending order"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                WHERE userId = ?
-                ORDER BY time DESC
-                LIMIT ? OFFSET ?
-            ''', (user_id, limit, offset))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching paginated tasks for user {user_id}: {str(e)}")
-            raise Exception(f"Failed to fetch paginated user tasks: {str(e)}")
-    
-    def get_tasks_by_user(self, user_id: str) -> List[Tuple]:
-        """Get all tasks for a specific user sorted by time in descending order"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                WHERE userId = ?
-                ORDER BY time DESC
-            ''', (user_id,))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching tasks for user {user_id}: {str(e)}")
-            raise Exception(f"Failed to fetch user tasks: {str(e)}")
-    
-    def get_tasks_by_status(self, status: str) -> List[Tuple]:
-        """Get all tasks with a specific status sorted by time in descending order"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                WHERE status = ?
-                ORDER BY time DESC
-            ''', (status,))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching tasks with status {status}: {str(e)}")
-            raise Exception(f"Failed to fetch tasks by status: {str(e)}")
-    
-    def get_tasks_by_category(self, category: str) -> List[Tuple]:
-        """Get all tasks in a specific category sorted by time in descending order"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                WHERE category = ?
-                ORDER BY time DESC
-            ''', (category,))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching tasks with category {category}: {str(e)}")
-            raise Exception(f"Failed to fetch tasks by category: {str(e)}")
+        
+        logger.debug("Updated task with ID: %s", task_id)
+        return updated_task
+    except sqlite3.Error as e:
+        logger.error(f"Error updating task {task_id}: {str(e)}")
+        raise Exception(f"Failed to update task: {str(e)}")
+
+@on_writer_thread
+def delete_task(db, task_id: int, user_id: str) -> int:
+    """Delete a task owned by the given user and return the number of deleted rows"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_DELETE_TASK, (task_id, user_id))
+        
+        db.commit()
+        
+        if cursor.rowcount == 0:
+            logger.warning("No task found with ID %s for user %s", task_id, user_id)
+        else:
+            invalidate_task_counts(user_id)
+            logger.debug("Deleted task with ID: %s", task_id)
+        return cursor.rowcount
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting task {task_id}: {str(e)}")
+        raise Exception(f"Failed to delete task: {str(e)}")
+
+def get_all_tasks_paginated(db, offset: int = 0, limit: int = 20) -> List[Dict]:
+    """Get all tasks with pagination sorted by time in descending order"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_SELECT_TASKS_OFFSET, (limit, offset))
+        
+        results = cursor.fetchall()
+        return [dict(row) for row in results]
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching paginated tasks: {str(e)}")
+        raise Exception(f"Failed to fetch paginated tasks: {str(e)}")
+
+def get_tasks_by_user_paginated(db, user_id: str, offset: int = 0, limit: int = 20) -> List[Dict]:
+    """Get paginated tasks for a specific user sorted by time in descending order"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_SELECT_USER_TASKS_OFFSET, (user_id, limit, offset))
+        
+        results = cursor.fetchall()
+        return [dict(row) for row in results]
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching paginated tasks for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to fetch paginated user tasks: {str(e)}")
+
+def get_tasks_page(db, limit: int, before_time: Optional[str] = None, before_id: Optional[int] = None) -> List[Dict]:
+    """Get up to limit tasks sorted by time in descending order, starting after the given cursor"""
+    try:
+        cursor = db.shared_cursor
+        if before_time is None:
+            cursor.execute(SQL_SELECT_TASKS_PAGE, (limit,))
+        else:
+            cursor.execute(SQL_SELECT_TASKS_PAGE_BEFORE, (before_time, before_id, limit))
+        
+        results = cursor.fetchall()
+        return [dict(row) for row in results]
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching page of tasks: {str(e)}")
+        raise Exception(f"Failed to fetch page of tasks: {str(e)}")
+
+def get_tasks_by_user_page(db, user_id: str, limit: int, before_time: Optional[str] = None, before_id: Optional[int] = None) -> List[Dict]:
+    """Get up to limit tasks for a specific user sorted by time in descending order, starting after the given cursor"""
+    try:
+        cursor = db.shared_cursor
+        if before_time is None:
+            cursor.execute(SQL_SELECT_USER_TASKS_PAGE, (user_id, limit))
+        else:
+            cursor.execute(SQL_SELECT_USER_TASKS_PAGE_BEFORE, (user_id, before_time, before_id, limit))
+        
+        results = cursor.fetchall()
+        return [dict(row) for row in results]
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching page of tasks for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to fetch page of user tasks: {str(e)}")
+
+def get_tasks_by_category(db, category: str) -> List[sqlite3.Row]:
+    """Get all tasks in a specific category sorted by time in descending order"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_SELECT_TASKS_BY_CATEGORY, (category,))
+        
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching tasks with category {category}: {str(e)}")
+        raise Exception(f"Failed to fetch tasks by category: {str(e)}")
+
+def get_task_count(db) -> int:
+    """Get total number of tasks"""
+    task_count = count_cache.get(ALL_TASKS_COUNT_KEY)
+    if task_count is not MISSING:
+        return task_count
     
-    def get_task_count(self) -> int:
-        """Get total number of tasks"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('SELECT COUNT(*) FROM tasks')
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except sqlite3.Error as e:
-            logger.error(f"Error counting tasks: {str(e)}")
-            raise Exception(f"Failed to count tasks: {str(e)}")
+    try:
+        generation = count_cache.generation
+        cursor = db.shared_cursor
+        cursor.execute(SQL_COUNT_TASKS)
+        result = cursor.fetchone()
+        task_count = result[0] if result else 0
+        count_cache.set(ALL_TASKS_COUNT_KEY, task_count, generation=generation)
+        return task_count
+    except sqlite3.Error as e:
+        logger.error(f"Error counting tasks: {str(e)}")
+        raise Exception(f"Failed to count tasks: {str(e)}")
+
+def get_user_task_count(db, user_id: str) -> int:
+    """Get number of tasks for a specific user"""
+    cache_key = user_task_count_key(user_id)
+    task_count = count_cache.get(cache_key)
+    if task_count is not MISSING:
+        return task_count
     
-    def get_user_task_count(self, user_id: str) -> int:
-        """Get number of tasks for a specific user"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('SELECT COUNT(*) FROM tasks WHERE userId = ?', (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except sqlite3.Error as e:
-            logger.error(f"Error counting tasks for user {user_id}: {str(e)}")
-            raise Exception(f"Failed to count user tasks: {str(e)}")
+    try:
+        generation = count_cache.generation
+        cursor = db.shared_cursor
+        cursor.execute(SQL_COUNT_USER_TASKS, (user_id,))
+        result = cursor.fetchone()
+        task_count = result[0] if result else 0
+        count_cache.set(cache_key, task_count, generation=generation)
+        return task_count
+    except sqlite3.Error as e:
+        logger.error(f"Error counting tasks for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to count user tasks: {str(e)}")
+
+def get_status_counts(db) -> Dict[str, int]:
+    """Get number of tasks for each status in a single grouped query"""
+    try:
+        cursor = db.shared_cursor
+        cursor.execute(SQL_COUNT_TASKS_BY_STATUS)
+        return {status: count for status, count in cursor.fetchall()}
+    except sqlite3.Error as e:
+        logger.error(f"Error counting tasks by status: {str(e)}")
+        raise Exception(f"Failed to count tasks by status: {str(e)}")
+
+def add_new_member(email: str, relationship: str, password: str, gender: str, nickname: str, birth: str) -> sqlite3.Row:
+    """Add a new member to the database and return the stored member row"""
+    # Hash before handing off to the writer thread, so other writes never wait on scrypt
+    return insert_member(email, relationship, hash_password(password), gender, nickname, birth)
+
+@on_writer_thread
+def insert_member(db, email: str, relationship: str, password_hash: str, gender: str, nickname: str, birth: str) -> sqlite3.Row:
+    """Insert a member with an already hashed password and return the stored member row"""
+    try:
+        cursor = db.cursor()
+        
+        # Generate a unique user ID (you might want to implement a more sophisticated ID generation)
+        user_id = str(uuid.uuid4())[:30]  # Limit to 30 characters as per schema
+        
+        cursor.execute(SQL_INSERT_MEMBER, (user_id, email, relationship, nickname, gender, birth, password_hash))
+        member = cursor.fetchone()
+        
+        db.commit()
+        logger.debug("Created new member with user ID: %s", user_id)
+        return member
+    except sqlite3.IntegrityError as e:
+        logger.error(f"Integrity error creating member: {str(e)}")
+        raise Exception(f"Failed to create member - email might already exist: {str(e)}")
+    except sqlite3.Error as e:
+        logger.error(f"Error creating member: {str(e)}")
+        raise Exception(f"Failed to create member: {str(e)}")
+
+def getUser(db, email: str, password: str) -> Optional[sqlite3.Row]:
+    """Get user details by validating email and password"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_SELECT_MEMBER_LOGIN, (email,))
+        
+        result = cursor.fetchone()
+        stored = result["password"] if result else DUMMY_PASSWORD_HASH
+        password_matches = verify_password(password, stored)
+        if not password_matches and result and not stored.startswith("scrypt$") and password != password.strip():
+            # Plaintext passwords were stripped before being stored, so accept the padded form
+            # the user has always typed; the rehash below then stores it exactly as typed
+            password_matches = verify_password(password.strip(), stored)
+        if password_matches and result:
+            # Passwords stored before hashing was introduced are upgraded on their next login
+            if password_needs_rehash(stored):
+                update_member_password(result["userId"], hash_password(password))
+            logger.debug("User authenticated successfully: %s", result[0])
+            return result
+        else:
+            logger.warning("email or password is incorrect")
+            return None
+    except sqlite3.Error as e:
+        logger.error(f"Error authenticating user with email {email}: {str(e)}")
+        raise Exception(f"Failed to authenticate user: {str(e)}")
+
+@on_writer_thread
+def update_member_password(db, user_id: str, password_hash: str):
+    """Replace a member's stored password with the given hash"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_UPDATE_MEMBER_PASSWORD, (password_hash, user_id))
+        db.commit()
+        logger.info("Upgraded stored password for user: %s", user_id)
+    except sqlite3.Error as e:
+        logger.error(f"Error updating password for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to update password: {str(e)}")
+
+@on_writer_thread
+def create_session(db, user_id: str) -> dict:
+    """Create a new session for a user and return session info"""
+    try:
+        cursor = db.cursor()
+        
+        # Expiration time (5 years from now) as unix seconds, shared by the token and the row
+        expires_at = int(time.time()) + SESSION_LIFETIME_SECONDS
+        
+        # Generate unique session ID and token
+        session_id = str(uuid.uuid4())
+        session_token = jwt.encode(
+            {
+                'user_id': user_id,
+                'session_id': session_id,
+                'exp': expires_at
+            },
+            JWT_SECRET,
+            algorithm=JWT_ALGORITHM
+        )
+        
+        # Insert the new session, replacing any existing one for this user
+        cursor.execute(SQL_UPSERT_SESSION, (session_id, user_id, session_token, expires_at))
+        
+        db.commit()
+        # The user's previous sessions are gone, so drop them from the cache too
+        session_cache.delete_value(user_id)
+        logger.debug("Created new session for user: %s", user_id)
+        
+        return {
+            "sessionToken": session_token,
+            "expiresAt": datetime.fromtimestamp(expires_at, timezone.utc)
+        }
+    except sqlite3.Error as e:
+        logger.error(f"Error creating session for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to create session: {str(e)}")
+
+def validate_session(db, session_token: str) -> Optional[str]:
+    """Validate a session token and return user ID if valid"""
+    cache_key = f"v1:session:{session_token}"
+    user_id = session_cache.get(cache_key)
+    if user_id is not MISSING:
+        return user_id
     
-    def add_new_member(self, email: str, relationship: str, password: str, gender: str, nickname: str, birth: str) -> str:
-        """Add a new member to the database and return the user ID"""
-        try:
-            cursor = self.db.cursor()
-            
-            # Generate a unique user ID (you might want to implement a more sophisticated ID generation)
-            import uuid
-            user_id = str(uuid.uuid4())[:30]  # Limit to 30 characters as per schema
-            
-            cursor.execute('''
-                INSERT INTO members (userId, email, relationship, nickname, gender, birthday, password, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, email, relationship, nickname, gender, birth, password, datetime.now().isoformat()))
-            
-            self.db.commit()
-            logger.info(f"Created new member with user ID: {user_id}")
-            return user_id
-        except sqlite3.IntegrityError as e:
-            logger.error(f"Integrity error creating member: {str(e)}")
-            raise Exception(f"Failed to create member - email might already exist: {str(e)}")
-        except sqlite3.Error as e:
-            logger.error(f"Error creating member: {str(e)}")
-            raise Exception(f"Failed to create member: {str(e)}")
+    # Forged, malformed or expired tokens are rejected by their signature alone,
+    # without a query; the table lookup below is only needed to honour logouts
+    try:
+        jwt.decode(session_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        logger.warning("Invalid or expired session token")
+        return None
     
-    def getUser(self, email: str, password: str) -> Optional[str]:
-        """Get user ID by validating email and password"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT userId
-                FROM members
-                WHERE email = ? AND password = ?
-            ''', (email, password))
-            
-            result = cursor.fetchone()
-            if result:
-                user_id = result[0]
-                logger.info(f"User authenticated successfully: {user_id}")
+    try:
+        # Concurrent misses on the same token wait for the first lookup instead of all hitting SQLite
+        with session_cache.key_lock(cache_key):
+            user_id = session_cache.get(cache_key)
+            if user_id is not MISSING:
                 return user_id
-            else:
-                logger.warning(f"email or password is incorrect")
-                return None
-        except sqlite3.Error as e:
-            logger.error(f"Error authenticating user with email {email}: {str(e)}")
-            raise Exception(f"Failed to authenticate user: {str(e)}")
-    
-    def create_session(self, user_id: str) -> dict:
-        """Create a new session for a user and return session info"""
-        try:
-            cursor = self.db.cursor()
-            
-            # Generate unique session ID and token
-            import uuid
-            import jwt
-            import time
-            
-            session_id = str(uuid.uuid4())
-            session_token = jwt.encode(
-                {
-                    'user_id': user_id,
-                    'session_id': session_id,
-                    'exp': int(time.time()) + (24 * 60 * 60*365*5)  # 24*365*5 hours from now
-                },
-                'your-secret-key',  # In production, use environment variable
-                algorithm='HS256'
-            )
-            
-            # Calculate expiration time (5 years from now)
-            from datetime import datetime, timedelta
-            expires_at = (datetime.now() + timedelta(hours=24*365*5)).isoformat()
-            
-            # Delete any existing sessions for this user
-            cursor.execute('DELETE FROM sessions WHERE userId = ?', (user_id,))
             
-            # Insert new session
-            cursor.execute('''
-                INSERT INTO sessions (sessionId, userId, sessionToken, expiresAt)
-                VALUES (?, ?, ?, ?)
-            ''', (session_id, user_id, session_token, expires_at))
-            
-            self.db.commit()
-            logger.info(f"Created new session for user: {user_id}")
-            
-            return {
-                "sessionToken": session_token,
-                "expiresAt": expires_at
-            }
-        except sqlite3.Error as e:
-            logger.error(f"Error creating session for user {user_id}: {str(e)}")
-            raise Exception(f"Failed to create session: {str(e)}")
-    
-    def validate_session(self, session_token: str) -> Optional[str]:
-        """Validate a session token and return user ID if valid"""
-        try:
-            cursor = self.db.cursor()
+            generation = session_cache.generation
+            now = time.time()
+            cursor = db.shared_cursor
             
             # Check if session exists and is not expired
-            cursor.execute('''
-                SELECT userId
-                FROM sessions
-                WHERE sessionToken = ? AND expiresAt > ?
-            ''', (session_token, datetime.now().isoformat()))
+            cursor.execute(SQL_SELECT_SESSION_USER, (session_token, int(now)))
             
             result = cursor.fetchone()
             if result:
-                user_id = result[0]
-                logger.info(f"Session validated for user: {user_id}")
+                user_id, expires_at = result
+                remaining = expires_at - now
+                session_cache.set(cache_key, user_id, ttl=min(SESSION_CACHE_TTL, remaining), generation=generation)
+                logger.debug("Session validated for user: %s", user_id)
                 return user_id
             else:
                 logger.warning("Invalid or expired session token")
                 return None
-        except sqlite3.Error as e:
-            logger.error(f"Error validating session: {str(e)}")
-            raise Exception(f"Failed to validate session: {str(e)}")
-    
-    def delete_session(self, user_id: str) -> bool:
-        """Delete all sessions for a user"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('DELETE FROM sessions WHERE userId = ?', (user_id,))
-            self.db.commit()
-            
-            if cursor.rowcount > 0:
-                logger.info(f"Deleted sessions for user: {user_id}")
-                return True
-            else:
-                logger.warning(f"No sessions found for user: {user_id}")
-                return False
-        except sqlite3.Error as e:
-            logger.error(f"Error deleting sessions for user {user_id}: {str(e)}")
-            raise Exception(f"Failed to delete sessions: {str(e)}")
+    except sqlite3.Error as e:
+        logger.error(f"Error validating session: {str(e)}")
+        raise Exception(f"Failed to validate session: {str(e)}")
+
+@on_writer_thread
+def delete_session(db, user_id: str) -> bool:
+    """Delete all sessions for a user"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_DELETE_USER_SESSIONS, (user_id,))
+        db.commit()
+        session_cache.delete_value(user_id)
+        
+        if cursor.rowcount > 0:
+            logger.debug("Deleted sessions for user: %s", user_id)
+            return True
+        else:
+            logger.warning("No sessions found for user: %s", user_id)
+            return False
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting sessions for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to delete sessions: {str(e)}")
+
+@on_writer_thread
+def delete_expired_sessions_batch(db, cutoff: int, batch_size: int) -> int:
+    """Delete up to batch_size sessions that expired by cutoff and return how many were deleted"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_DELETE_EXPIRED_SESSIONS_BATCH, (cutoff, batch_size))
+        db.commit()
+        return cursor.rowcount
+    except sqlite3.Error as e:
+        logger.error(f"Error cleaning up expired sessions: {str(e)}")
+        raise Exception(f"Failed to cleanup sessions: {str(e)}")
+
+def cleanup_expired_sessions(batch_size: int = SESSION_CLEANUP_BATCH_SIZE) -> int:
+    """Clean up expired sessions and return number of deleted sessions"""
+    # One short transaction per batch, so request writes queued on the writer run in between
+    cutoff = int(time.time())
+    deleted_count = 0
+    while True:
+        batch_count = delete_expired_sessions_batch(cutoff, batch_size)
+        deleted_count += batch_count
+        if batch_count < batch_size:
+            break
     
-    def cleanup_expired_sessions(self) -> int:
-        """Clean up expired sessions and return number of deleted sessions"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('DELETE FROM sessions WHERE expiresAt <= ?', (datetime.now().isoformat(),))
-            deleted_count = cursor.rowcount
-            self.db.commit()
-            
-            if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} expired sessions")
-            
-            return deleted_count
-        except sqlite3.Error as e:
-            logger.error(f"Error cleaning up expired sessions: {str(e)}")
-            raise Exception(f"Failed to cleanup sessions: {str(e)}")
+    if deleted_count > 0:
+        logger.info("Cleaned up %s expired sessions", deleted_count)
     
-    def get_user_by_id(self, user_id: str) -> Optional[Tuple]:
-        """Get user details by user ID"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT userId, email, relationship, nickname, gender, birthday
-                FROM members
-                WHERE userId = ?
-            ''', (user_id,))
-            
-            result = cursor.fetchone()
-            if result:
-                return tuple(result)
-            return None
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching user by ID {user_id}: {str(e)}")
-            raise Exception(f"Failed to fetch user: {str(e)}")
-
-    def get_user_tasks_by_month(self, user_id: str, year: int, month: int) -> List[Tuple]:
-        """Get all tasks for a specific user in a specific month"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT taskId, userId, taskName, category, time, status
-                FROM tasks
-                WHERE userId = ? AND strftime('%Y', time) = ? AND strftime('%m', time) = ?
-                ORDER BY time DESC
-            ''', (user_id, str(year), f"{month:02d}"))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching tasks for user {user_id} in {year}-{month:02d}: {str(e)}")
-            raise Exception(f"Failed to fetch user tasks by month: {str(e)}")
-
-    def get_completed_tasks_by_category_for_user(self, user_id: str) -> List[Tuple]:
-        """Get count of completed tasks by category for a specific user"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT category, COUNT(*) as count
-                FROM tasks
-                WHERE userId = ? AND status = 'completed'
-                GROUP BY category
-                ORDER BY count DESC
-            ''', (user_id,))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching completed tasks by category for user {user_id}: {str(e)}")
-            raise Exception(f"Failed to fetch completed tasks by category: {str(e)}")
-
-    def get_completed_tasks_by_category_all_users(self) -> List[Tuple]:
-        """Get count of completed tasks by category across all users"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT category, COUNT(*) as count
-                FROM tasks
-                WHERE status = 'completed'
-                GROUP BY category
-                ORDER BY count DESC
-            ''')
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching completed tasks by category for all users: {str(e)}")
-            raise Exception(f"Failed to fetch completed tasks by category for all users: {str(e)}")
-
-    def get_completed_tasks_by_category_this_week_for_user(self, user_id: str) -> List[Tuple]:
-        """Get count of completed tasks by category for a specific user for the current week"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT category, COUNT(*) as count
-                FROM tasks
-                WHERE userId = ? AND status = 'completed' 
-                AND strftime('%Y-%W', time) = strftime('%Y-%W', 'now')
-                GROUP BY category
-                ORDER BY count DESC
-            ''', (user_id,))
-            
-            results = cursor.fetchall()
-            return [tuple(row) for row in results]
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching completed tasks by category for user {user_id} this week: {str(e)}")
-            raise Exception(f"Failed to fetch completed tasks by category this week: {str(e)}")
+    return deleted_count
+
+def iter_user_tasks_by_month(db, user_id: str, year: int, month: int, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Yield all tasks for a specific user in a specific month in batches, reading the cursor lazily"""
+    try:
+        cursor = db.cursor()
+        start, end = month_bounds(year, month)
+        cursor.execute(SQL_SELECT_USER_TASKS_BY_MONTH, (user_id, start, end))
+        
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching tasks for user {user_id} in {year}-{month:02d}: {str(e)}")
+        raise Exception(f"Failed to fetch user tasks by month: {str(e)}")
+
+def get_completed_tasks_by_category_for_user(db, user_id: str) -> List[sqlite3.Row]:
+    """Get count of completed tasks by category for a specific user"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_COUNT_COMPLETED_BY_CATEGORY_FOR_USER, (user_id,))
+        
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching completed tasks by category for user {user_id}: {str(e)}")
+        raise Exception(f"Failed to fetch completed tasks by category: {str(e)}")
+
+def get_completed_tasks_by_category_all_users(db) -> List[sqlite3.Row]:
+    """Get count of completed tasks by category across all users"""
+    try:
+        cursor = db.cursor()
+        cursor.execute(SQL_COUNT_COMPLETED_BY_CATEGORY)
+        
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching completed tasks by category for all users: {str(e)}")
+        raise Exception(f"Failed to fetch completed tasks by category for all users: {str(e)}")
+
+def get_completed_tasks_by_category_this_week_for_user(db, user_id: str) -> List[sqlite3.Row]:
+    """Get count of completed tasks by category for a specific user for the current week"""
+    try:
+        cursor = db.cursor()
+        start, end = current_week_bounds()
+        cursor.execute(SQL_COUNT_COMPLETED_BY_CATEGORY_THIS_WEEK_FOR_USER, (user_id, start, end))
+        
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching completed tasks by category for user {user_id} this week: {str(e)}")
+        raise Exception(f"Failed to fetch completed tasks by category this week: {str(e)}")
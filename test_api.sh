@@ -194,8 +194,7 @@ echo ""
 echo -e "${BLUE}11. Logout User${NC}"
 echo "POST /logout"
 LOGOUT_RESPONSE=$(curl -s -X POST "$BASE_URL/logout" \
-  -H "Content-Type: application/json" \
-  -d '{"session_token": "'$SESSION_TOKEN'"}')
+  -H "Authorization: Bearer $SESSION_TOKEN")
 
 echo "Response: $LOGOUT_RESPONSE"
 print_result $?